@@ -0,0 +1,210 @@
+import unittest
+
+import io
+import os
+import signal
+import threading
+import time
+from contextlib import redirect_stdout
+from unittest import mock
+
+from ykdpyutil import console
+
+
+class LinePrinterTest(unittest.TestCase):
+
+    def test_print(self):
+        printer = console.LinePrinter(max_width=6)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            # テスト対象の実行
+            printer.print("abc")
+            printer.print("abcdefgh")
+            printer.print("aあいう")
+
+        self.assertEqual(out.getvalue(), "\rabc   \rabcdef\raあい")
+
+    def test_print_same_text(self):
+        printer = console.LinePrinter(max_width=4)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            # テスト対象の実行
+            printer.print("ab")
+            print()
+            printer.print("ab")
+
+        self.assertEqual(out.getvalue(), "\rab  \n\rab  ")
+
+    def test_print_interval_skip_same_text(self):
+        printer = console.LinePrinter(max_width=4, interval=1.0)
+        out = io.StringIO()
+        with mock.patch("time.monotonic") as monotonic, redirect_stdout(out):
+            monotonic.side_effect = [10.0, 11.0]
+            # テスト対象の実行
+            printer.print("ab")
+            printer.print("ab")
+
+        self.assertEqual(out.getvalue(), "\rab  ")
+
+    def test_print_interval(self):
+        printer = console.LinePrinter(max_width=2, interval=1.0)
+        out = io.StringIO()
+        with mock.patch("time.monotonic") as monotonic, redirect_stdout(out):
+            monotonic.side_effect = [10.0, 10.5, 10.9, 11.2, 11.3]
+            # テスト対象の実行
+            with printer:
+                for text in ["1", "2", "3", "4", "5"]:
+                    printer.print(text)
+
+        self.assertEqual(out.getvalue(), "\r1 \r4 \r5 ")
+
+
+class LiveDisplayTest(unittest.TestCase):
+
+    def test_refresh(self):
+        display = console.LiveDisplay(3, max_width=6)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            display.set(0, "a")
+            display.set(1, "b")
+            display.set(2, "c")
+            # テスト対象の実行
+            display.refresh()
+            first = out.getvalue()
+            out.seek(0)
+            out.truncate()
+            display.set(1, "bbbbbbbb")
+            display.refresh()
+            second = out.getvalue()
+            out.seek(0)
+            out.truncate()
+            display.refresh()
+            third = out.getvalue()
+
+        self.assertEqual(
+            first,
+            "\n\n\n\x1b[3A\ra\x1b[K\x1b[1B\rb\x1b[K\x1b[1B\rc\x1b[K"
+            "\x1b[1B\r")
+        self.assertEqual(second, "\x1b[2A\rbbbbb\x1b[K\x1b[2B\r")
+        self.assertEqual(third, "")
+
+    def test_refresh_resized(self):
+        display = console.LiveDisplay(2, max_width=6)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            display.set(0, "a")
+            display.set(1, "b")
+            display.refresh()
+            out.seek(0)
+            out.truncate()
+            display.max_width = 8
+            # テスト対象の実行
+            display.refresh()
+
+        self.assertEqual(
+            out.getvalue(),
+            "\x1b[2A\ra\x1b[K\x1b[1B\rb\x1b[K\x1b[1B\r")
+
+
+@unittest.skipUnless(hasattr(signal, "SIGWINCH"), "SIGWINCH is not supported")
+class TerminalSizeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.previous_handler = signal.getsignal(signal.SIGWINCH)
+        console._terminal_size = None
+        console._resize_watched = False
+
+    def tearDown(self):
+        signal.signal(signal.SIGWINCH, self.previous_handler)
+        console._terminal_size = None
+        console._resize_watched = False
+
+    def test_live_display_tracks_resize(self):
+        display = console.LiveDisplay(2, interval=0.005)
+        size = os.terminal_size((20, 10))
+        out = io.StringIO()
+        with mock.patch("shutil.get_terminal_size",
+                        return_value=size) as get_terminal_size, \
+                redirect_stdout(out):
+            # テスト対象の実行(表示スレッドのみが出力する)
+            with display:
+                display.set(0, "a")
+                time.sleep(0.1)
+                self.assertEqual(get_terminal_size.call_count, 1)
+                self.assertEqual(console._terminal_size, size)
+
+                os.kill(os.getpid(), signal.SIGWINCH)
+                display.set(1, "b")
+                time.sleep(0.1)
+
+        self.assertEqual(get_terminal_size.call_count, 2)
+
+
+class ProgressTest(unittest.TestCase):
+
+    def test_update_from_threads(self):
+        progress = console.Progress(total=4000, total_bytes=40000,
+                                    printer=console.LinePrinter(max_width=120))
+
+        def work():
+            for _ in range(1000):
+                progress.update(nbytes=10)
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            # テスト対象の実行
+            with progress:
+                workers = [threading.Thread(target=work) for _ in range(4)]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+
+        self.assertEqual(progress.count, 4000)
+        self.assertEqual(progress.bytes, 40000)
+        self.assertIn("4000/4000", out.getvalue())
+        self.assertIn("100%", out.getvalue())
+        self.assertTrue(out.getvalue().endswith("\n"))
+
+    def test_close_throttled_printer(self):
+        printer = console.LinePrinter(max_width=60, interval=10)
+        progress = console.Progress(total=3, interval=60, printer=printer)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            # テスト対象の実行
+            with progress:
+                printer.print("0/3")
+                progress.update(3)
+
+        last_line = out.getvalue().rsplit("\r", 1)[1]
+        self.assertIn("3/3", last_line)
+        self.assertTrue(last_line.endswith("\n"))
+
+    def test_wrap(self):
+        progress = console.Progress(interval=60)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            # テスト対象の実行
+            result = list(progress.wrap(["a", "b", "c"]))
+
+        self.assertListEqual(result, ["a", "b", "c"])
+        self.assertEqual(progress.total, 3)
+        self.assertEqual(progress.count, 3)
+
+    def test_format(self):
+        progress = console.Progress(total=10, label="copy")
+        progress.update(5, nbytes=2048)
+        progress._rate = 2.0
+        progress._byte_rate = 0
+
+        # テスト対象の実行
+        result = progress.format()
+
+        self.assertEqual(
+            result,
+            "copy [##########..........]  50% 5/10 2.0 KB 2.0 it/s "
+            "ETA 00:00:02")
+
+
+if __name__ == "__main__":
+    unittest.main()
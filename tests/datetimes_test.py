@@ -0,0 +1,189 @@
+import unittest
+
+import os
+import time
+from datetime import date, datetime, timedelta
+
+from ykdpyutil import datetimes
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class DatetimesTest(unittest.TestCase):
+
+    def test_get_from_str(self):
+        # テスト対象の実行
+        result = datetimes.get_from_str("2020-02-29 23:59:58.123456")
+
+        self.assertEqual(result, datetime(2020, 2, 29, 23, 59, 58, 123456))
+
+    def test_get_from_str_invalid(self):
+        self.assertIsNone(datetimes.get_from_str(None))
+        self.assertIsNone(datetimes.get_from_str("2019-02-29 23:59:58.123456"))
+        self.assertIsNone(datetimes.get_from_str("2020-02-29 23:59:58.1234Z"))
+        self.assertIsNone(datetimes.get_from_str("2020-02-29"))
+
+    def test_get_from_str_fallback(self):
+        # 桁数の省略など、固定幅でない文字列は strptime と同じ結果になる
+        cases = [
+            ("2020-2-9 3:04:05.1", datetimes.DEFAULT_PATTERN),
+            ("2020-02-09  03:04:05.123", datetimes.DEFAULT_PATTERN),
+            ("2020-02-09T03:04:05.123", datetimes.ISO_PATTERN),
+            ("2020/2/9", "%Y/%m/%d"),
+            ("Sun 2020-02-09", "%a %Y-%m-%d")]
+        for dt_str, pattern in cases:
+            with self.subTest(dt_str=dt_str):
+                # テスト対象の実行
+                result = datetimes.get_from_str(dt_str, pattern)
+
+                self.assertEqual(result, datetime.strptime(dt_str, pattern))
+
+    def test_get_parser(self):
+        # テスト対象の実行
+        parser = datetimes.get_parser("%Y%m%d%H%M")
+
+        self.assertIs(parser, datetimes.get_parser("%Y%m%d%H%M"))
+        self.assertEqual(datetimes.get_from_str("202002292359", parser),
+                         datetime(2020, 2, 29, 23, 59))
+        self.assertIsNone(parser.parse("202013012359"))
+
+    def test_to_str(self):
+        dt = datetime(2020, 2, 29, 23, 59, 58, 123456)
+
+        self.assertIsNone(datetimes.to_str(None))
+        self.assertEqual(datetimes.to_str(dt), "2020-02-29 23:59:58.123456")
+        self.assertEqual(datetimes.to_str(dt, "%Y/%m/%d %%f %f"),
+                         "2020/02/29 %f 123456")
+
+    def test_to_str_date(self):
+        # テスト対象の実行
+        result = datetimes.to_str(date(2020, 1, 2), "%Y-%m-%d")
+
+        self.assertEqual(result, "2020-01-02")
+
+    def test_get_formatter(self):
+        pattern = "%Y-%m-%d %H:%M:%S.%f"
+        formatter = datetimes.get_formatter(pattern)
+        dt = datetime(2020, 2, 29, 23, 59, 58, 999999)
+        values = [dt, dt.replace(microsecond=1),
+                  dt.replace(second=59, microsecond=0),
+                  dt.replace(minute=58), dt.replace(day=1)]
+
+        self.assertIs(formatter, datetimes.get_formatter(pattern))
+        for value in values:
+            with self.subTest(value=value):
+                # テスト対象の実行
+                result = datetimes.to_str(value, formatter)
+
+                self.assertEqual(result, value.strftime(pattern))
+
+    def test_get_formatter_per_minute(self):
+        formatter = datetimes.get_formatter("%Y-%m-%d %H:%M")
+        dt = datetime(2020, 2, 29, 23, 58, 59, 999999)
+
+        self.assertEqual(formatter.format(dt), "2020-02-29 23:58")
+        self.assertEqual(formatter.format(dt.replace(second=0)),
+                         "2020-02-29 23:58")
+        self.assertEqual(formatter.format(dt + timedelta(microseconds=1)),
+                         "2020-02-29 23:59")
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class DatetimesManyTest(unittest.TestCase):
+
+    def test_get_from_str_many(self):
+        values = ["2020-02-29 23:59:58.123456", None,
+                  "2019-02-29 00:00:00.000000", "2020-2-9 3:04:05.1", "x"]
+
+        # テスト対象の実行
+        result = datetimes.get_from_str_many(values)
+
+        expected = numpy.array(
+            [datetime(2020, 2, 29, 23, 59, 58, 123456), None, None,
+             datetime(2020, 2, 9, 3, 4, 5, 100000), None],
+            dtype="datetime64[us]")
+        numpy.testing.assert_array_equal(result, expected)
+        self.assertListEqual(
+            datetimes.get_from_str_many(values, as_array=False),
+            [datetimes.get_from_str(v) for v in values])
+
+    def test_get_from_str_many_non_contiguous(self):
+        values = numpy.array(["2020-02-29 23:59:58.123456", "x"] * 2)[::2]
+
+        # テスト対象の実行
+        result = datetimes.get_from_str_many(values)
+
+        expected = numpy.array(
+            [datetime(2020, 2, 29, 23, 59, 58, 123456)] * 2,
+            dtype="datetime64[us]")
+        numpy.testing.assert_array_equal(result, expected)
+
+    def test_to_str_many(self):
+        values = numpy.array(["2020-02-29T23:59:58.123456", "NaT"],
+                             dtype="datetime64[us]")
+
+        # テスト対象の実行
+        result = datetimes.to_str_many(values)
+
+        self.assertListEqual(result, ["2020-02-29 23:59:58.123456", None])
+
+    def test_utc_many(self):
+        values = [datetime(2020, 2, 29, 23, 59, 58, 123456), None]
+
+        # テスト対象の実行
+        utc = datetimes.to_utc_many(values)
+        result = datetimes.get_from_utc_many(utc)
+
+        self.assertEqual(utc[0], datetimes.to_utc(values[0]))
+        self.assertTrue(numpy.isnan(utc[1]))
+        numpy.testing.assert_array_equal(
+            result, numpy.array(values, dtype="datetime64[us]"))
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+@unittest.skipUnless(hasattr(time, "tzset"), "tzset is not supported")
+class DatetimesManyLocalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.previous_tz = os.environ.get("TZ")
+        os.environ["TZ"] = "America/New_York"
+        time.tzset()
+
+    def tearDown(self):
+        if self.previous_tz is None:
+            del os.environ["TZ"]
+        else:
+            os.environ["TZ"] = self.previous_tz
+        time.tzset()
+
+    def test_to_utc_many_fold(self):
+        # 夏時間の終了により 2 回現れる 1:30 の 2 回目
+        values = [datetime(2021, 11, 7, 1, 30, fold=1),
+                  datetime(2021, 11, 7, 1, 30)]
+
+        # テスト対象の実行
+        result = datetimes.to_utc_many(values)
+
+        self.assertListEqual(list(result), [1636266600.0, 1636263000.0])
+        self.assertListEqual(list(result),
+                             [datetimes.to_utc(v) for v in values])
+
+    def test_get_from_utc_many_rounding(self):
+        values = [1615708737.2856314, 1615708737.0000005, -0.0000005]
+
+        # テスト対象の実行
+        result = datetimes.get_from_utc_many(values)
+
+        numpy.testing.assert_array_equal(
+            result,
+            numpy.array([datetime.fromtimestamp(v) for v in values],
+                        dtype="datetime64[us]"))
+        self.assertEqual(result[0], numpy.datetime64(
+            "2021-03-14T03:58:57.285631"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
 
 import datetime
+import os
+import re
 from pathlib import Path
+from unittest import mock
 
 from ykdpyutil import files
 
@@ -353,6 +356,185 @@ class FilesTest(unittest.TestCase):
         self.assertEqual(result_prefix, ".test")
         self.assertIsNone(result_suffix)
 
+    def write_lines_file(self, name, content):
+        target = Path(TEMP_DIR, name)
+        target.write_bytes(content)
+        return target
+
+    def test_iter_lines(self):
+        self.clear_temp_dir()
+        target = self.write_lines_file("lines.txt", b"a\n\nbc\nd")
+        empty = self.write_lines_file("empty.txt", b"")
+
+        # テスト対象の実行
+        result = list(files.iter_lines(target))
+
+        self.assertListEqual(result, [b"a", b"", b"bc", b"d"])
+        self.assertListEqual(list(files.iter_lines(empty)), [])
+
+    def test_iter_lines_raises(self):
+        with self.assertRaises(OSError):
+            # テスト対象の実行(イテレーターを取得した時点で確認する)
+            files.iter_lines(Path("not_exists_file"))
+
+    def test_tail(self):
+        self.clear_temp_dir()
+        target = self.write_lines_file("lines.txt", b"a\n\nbc\nd\n")
+
+        # テスト対象の実行
+        result = files.tail(target, 3)
+
+        self.assertListEqual(result, [b"", b"bc", b"d"])
+        self.assertListEqual(files.tail(target, 10), [b"a", b"", b"bc", b"d"])
+        self.assertListEqual(files.tail(target, 0), [])
+
+    def test_line_index(self):
+        self.clear_temp_dir()
+        target = self.write_lines_file("lines.txt", b"a\n\nbc\nd")
+
+        # テスト対象の実行
+        with files.LineIndex(target) as index:
+            self.assertEqual(len(index), 4)
+            self.assertEqual(index[2], b"bc")
+            self.assertEqual(index[-1], b"d")
+            self.assertEqual(index.offset(3), 6)
+
+    def test_search(self):
+        self.clear_temp_dir()
+        target1 = self.write_lines_file("1.txt", b"error: a\nok\nerror: b")
+        target2 = self.write_lines_file("2.txt", b"ok\nerror error")
+
+        # テスト対象の実行
+        result = files.search([target1, target2], b"error")
+
+        self.assertListEqual(result, [
+            (target1, 0, b"error: a"),
+            (target1, 12, b"error: b"),
+            (target2, 3, b"error error")])
+        self.assertListEqual(
+            files.search([target1, target2], re.compile(rb"^ok$", re.M)),
+            [(target1, 9, b"ok"), (target2, 0, b"ok")])
+        self.assertListEqual(
+            files.search([target1, target2], b"error", processes=True),
+            result)
+
+    def test_write_atomic(self):
+        self.clear_temp_dir()
+        target = Path(TEMP_DIR, "sub", "atomic.txt")
+
+        # テスト対象の実行
+        files.write_atomic(target, "テスト")
+        files.write_atomic(target, b"overwritten")
+
+        self.assertEqual(target.read_bytes(), b"overwritten")
+        self.assertListEqual(files.get_files(target.parent), [target])
+
+    def test_atomic_batch(self):
+        self.clear_temp_dir()
+        targets = [Path(TEMP_DIR, "a", str(i)) for i in range(3)] \
+            + [Path(TEMP_DIR, "b", "0")]
+
+        # テスト対象の実行
+        with files.AtomicBatch() as batch:
+            for target in targets:
+                batch.write(target, target.name)
+            self.assertFalse(any(target.exists() for target in targets))
+
+        for target in targets:
+            self.assertEqual(target.read_text(), target.name)
+        self.assertEqual(len(files.get_files(TEMP_DIR, recursive=True)), 4)
+
+    @unittest.skipUnless(os.name == "posix", "directory fsync is POSIX only")
+    def test_atomic_batch_fsync_created_dirs(self):
+        self.clear_temp_dir()
+        targets = [Path(TEMP_DIR, "new", "sub", "0"),
+                   Path(TEMP_DIR, "new", "sub", "1"),
+                   Path(TEMP_DIR, "new", "2")]
+
+        with mock.patch("ykdpyutil.files._fsync",
+                        wraps=files._fsync) as fsync:
+            # テスト対象の実行
+            with files.AtomicBatch() as batch:
+                for target in targets:
+                    batch.write(target, b"data")
+
+        synced_dirs = [call.args[0] for call in fsync.call_args_list
+                       if call.args[1] == os.O_RDONLY]
+        self.assertListEqual(synced_dirs, [
+            Path(TEMP_DIR, "new", "sub"),
+            Path(TEMP_DIR, "new"),
+            TEMP_DIR])
+
+    def test_atomic_batch_rollback(self):
+        self.clear_temp_dir()
+        target = Path(TEMP_DIR, "rollback.txt")
+
+        with self.assertRaises(ValueError):
+            # テスト対象の実行
+            with files.AtomicBatch() as batch:
+                batch.write(target, b"data")
+                raise ValueError()
+
+        self.assertEqual(len(files.get_paths(TEMP_DIR)), 0)
+
+    def test_stat_cache(self):
+        self.clear_temp_dir()
+        target = Path(TEMP_DIR, "test")
+        target.touch()
+        cache = files.StatCache(ttl=60)
+
+        # テスト対象の実行
+        times = files.get_times(target, cache)
+        files.check_exists(target, cache)
+        created = files.get_created(target, cache)
+        updated = files.get_updated(target, cache)
+        accessed = files.get_accessed(target, cache)
+
+        self.assertEqual(times, (created, updated, accessed))
+        self.assertEqual(times, files.get_times(target))
+        self.assertEqual((cache.hits, cache.misses), (4, 1))
+
+    def test_stat_cache_not_exists(self):
+        self.clear_temp_dir()
+        target = Path(TEMP_DIR, "not_exists")
+        cache = files.StatCache(ttl=60)
+
+        # テスト対象の実行
+        self.assertEqual(files.get_times(target, cache), (None, None, None))
+        with self.assertRaises(OSError):
+            files.check_exists(target, cache)
+        target.touch()
+        with self.assertRaises(OSError):
+            files.check_exists(target, cache)
+        cache.invalidate(target)
+        files.check_exists(target, cache)
+
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_stat_cache_ttl(self):
+        self.clear_temp_dir()
+        target = Path(TEMP_DIR, "test")
+        target.touch()
+        cache = files.StatCache(ttl=1.0)
+
+        with mock.patch("time.monotonic") as monotonic:
+            monotonic.side_effect = [10.0, 10.5, 11.0]
+            # テスト対象の実行
+            for _ in range(3):
+                cache.stat(target)
+
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_stat_cache_lru(self):
+        cache = files.StatCache(maxsize=2, ttl=60)
+
+        # テスト対象の実行
+        for path in [TEST_PATHS[0], TEST_PATHS[1], TEST_PATHS[0],
+                     TEST_PATHS[2], TEST_PATHS[0], TEST_PATHS[1]]:
+            cache.stat(path)
+
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET_US = 30000
+"""ykdpyutil のモジュール自体の読み込み時間(依存モジュールを除く)の上限
+(マイクロ秒)。バイトコードのキャッシュがない場合のコンパイル時間を含む。
+"""
+
+EAGER_DEPENDENCIES = [
+    "array", "collections", "contextlib", "datetime", "errno", "functools",
+    "importlib", "os", "pathlib", "re", "sys", "threading", "time",
+    "typing", "unicodedata"]
+"""ykdpyutil の各モジュールが読み込み時に import してよい標準ライブラリ。
+"""
+
+
+def run_python(code):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True)
+    return result.stdout, result.stderr
+
+
+def import_time(stderr):
+    """-X importtime の出力から、ykdpyutil のモジュール自体の読み込み時間
+    (依存する標準ライブラリなどを除く)を合計する。
+    """
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_time, _, name = line.split("|")
+        if name.strip().startswith("ykdpyutil"):
+            total += int(self_time.split(":")[1])
+    return total
+
+
+class PackageTest(unittest.TestCase):
+
+    def test_lazy_submodules(self):
+        # テスト対象の実行
+        stdout, stderr = run_python(
+            "import sys, ykdpyutil\n"
+            "print(sorted(m for m in sys.modules"
+            " if m.startswith('ykdpyutil.')))\n"
+            "print(ykdpyutil.texts.width('aあ'))\n"
+            "print(sorted(m for m in sys.modules"
+            " if m.startswith('ykdpyutil.')))\n")
+
+        self.assertListEqual(
+            stdout.splitlines(), ["[]", "3", "['ykdpyutil.texts']"])
+        self.assertLess(import_time(stderr), IMPORT_TIME_BUDGET_US)
+
+    def test_deferred_dependencies(self):
+        # テスト対象の実行
+        stdout, stderr = run_python(
+            "import sys\n"
+            "import ykdpyutil.console, ykdpyutil.datetimes, ykdpyutil.files\n"
+            "print(sorted(m for m in ('numpy', 'shutil', 'signal')"
+            " if m in sys.modules))\n")
+
+        self.assertEqual(stdout.strip(), "[]")
+        self.assertLess(import_time(stderr), IMPORT_TIME_BUDGET_US)
+
+    def test_eager_dependencies(self):
+        # テスト対象の実行
+        # 許可した依存モジュールを先に読み込み、それ以外に読み込まれる
+        # モジュールがないことを確認する
+        stdout, _ = run_python(
+            "import sys\n"
+            "import " + ", ".join(EAGER_DEPENDENCIES) + "\n"
+            "before = set(sys.modules)\n"
+            "import ykdpyutil.console, ykdpyutil.datetimes, ykdpyutil.files\n"
+            "print(sorted(m for m in set(sys.modules) - before"
+            " if m.split('.')[0] != 'ykdpyutil'))\n")
+
+        self.assertEqual(stdout.strip(), "[]")
+
+    def test_unknown_attribute(self):
+        import ykdpyutil
+
+        with self.assertRaises(AttributeError):
+            ykdpyutil.unknown
+
+
+if __name__ == "__main__":
+    unittest.main()
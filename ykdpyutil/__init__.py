@@ -0,0 +1,20 @@
+"""Python ユーティリティパッケージ。
+
+サブモジュールは属性として最初に参照された時点で読み込む。
+"""
+import importlib
+
+__all__ = ["console", "datetimes", "files", "texts"]
+
+
+def __getattr__(name):
+    if name not in __all__:
+        raise AttributeError(
+            "module {0!r} has no attribute {1!r}".format(__name__, name))
+    module = importlib.import_module("." + name, __name__)
+    globals()[name] = module
+    return module
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,27 +1,100 @@
-import shutil
+import sys
+import threading
+import time
 
 from ykdpyutil import texts
 
+_terminal_size = None
+_resize_watched = False
+
+
+def _get_terminal_size():
+    """端末のサイズを取得する。
+
+    取得したサイズは SIGWINCH を受信するまで再利用する。
+    SIGWINCH を監視できない場合は毎回問い合わせる。
+
+    Returns:
+        端末のサイズ(columns, lines)
+    """
+    global _terminal_size
+    size = _terminal_size
+    if size is None:
+        import shutil
+        size = shutil.get_terminal_size()
+        if _watch_resize():
+            _terminal_size = size
+    return size
+
+
+def _watch_resize():
+    global _resize_watched
+    if _resize_watched:
+        return True
+    import signal
+    if not hasattr(signal, "SIGWINCH"):
+        return False
+    if threading.current_thread() is not threading.main_thread():
+        return False
+    previous = signal.getsignal(signal.SIGWINCH)
+
+    def handler(signum, frame):
+        global _terminal_size
+        _terminal_size = None
+        if callable(previous):
+            previous(signum, frame)
+
+    signal.signal(signal.SIGWINCH, handler)
+    _resize_watched = True
+    return True
+
+
+def _truncate(text, max_width):
+    result_width = 0
+    for i, c in enumerate(text):
+        result_width += texts.width(c)
+        if result_width > max_width:
+            return text[:i]
+    return text
+
 
 class LinePrinter:
     """同一行への出力を行う。
 
+    interval を指定した場合、出力は最大で interval 秒に 1 回へ間引かれる。
+    間引かれた文字列は保持され、flush() またはコンテキスト終了時に出力される。
+    また、前回の出力と同じ文字列は出力しない。
+
     Attributes:
         max_width: 行の最大幅
         fillchar: 空白埋め文字
+        interval: 出力の最小間隔(秒)
     """
 
     def __init__(
             self,
-            max_width=shutil.get_terminal_size().columns,
-            fillchar=" "):
+            max_width=None,
+            fillchar=" ",
+            interval=0.0):
         """
         Args:
-            max_width: 行の最大幅(default: 120)
+            max_width: 行の最大幅(default: None (端末の幅))
             fillchar: 空白埋め文字(default: 半角スペース)
+            interval: 出力の最小間隔(秒)(default: 0.0 (間引きなし))
         """
         self.max_width = max_width
         self.fillchar = fillchar
+        self.interval = interval
+        self._next_time = 0.0
+        self._pending = None
+        self._last_text = None
+        self._last_width = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
 
     def print(self, text):
         """文字列を出力する。
@@ -29,19 +102,360 @@ class LinePrinter:
         Args:
             text: 出力する文字列
         """
+        if self.interval > 0:
+            now = time.monotonic()
+            if now < self._next_time:
+                self._pending = text
+                return
+            self._next_time = now + self.interval
+        self._pending = None
+        self._write(text)
+
+    def flush(self):
+        """間引かれて未出力の文字列を出力する。
+        """
+        if self._pending is None:
+            return
+        text = self._pending
+        self._pending = None
+        self._write(text)
+
+    def fit(self, text):
+        """文字列を行の最大幅に合わせる。
+
+        Args:
+            text: 対象文字列
+
+        Returns:
+            最大幅に満たない場合は空白埋め、超える場合は切り詰めた文字列
+        """
+        max_width = self.max_width or _get_terminal_size().columns
         text_width = texts.width(text)
-        text_length = len(text)
-        if text_width < self.max_width:
-            text = text.ljust(text_length + self.max_width -
-                              text_width, self.fillchar)
+        if text_width < max_width:
+            return text.ljust(len(text) + max_width - text_width,
+                              self.fillchar)
+        return _truncate(text, max_width)
+
+    def _write(self, text):
+        max_width = self.max_width or _get_terminal_size().columns
+        if self.interval > 0 and text == self._last_text \
+                and max_width == self._last_width:
+            return
+        self._last_text = text
+        self._last_width = max_width
+        print("\r" + self.fit(text), end="", flush=True)
+
+
+class LiveDisplay:
+    """複数行への出力を行う。
+
+    各行の文字列は set() で更新し、表示はバックグラウンドスレッドが
+    interval 秒ごとに行う。前回の表示から変化した行だけを
+    ANSI エスケープシーケンスによるカーソル移動で書き換え、
+    1 回の表示は 1 回の書き込みにまとめる。
+    複数のワーカースレッドから同時に set() を呼び出してよい。
+
+    Attributes:
+        lines: 行数
+        max_width: 行の最大幅(None の場合は端末の幅)
+        interval: 表示間隔(秒)
+    """
+
+    def __init__(self, lines, max_width=None, interval=0.1):
+        """
+        Args:
+            lines: 行数
+            max_width: 行の最大幅(default: None (端末の幅))
+            interval: 表示間隔(秒)(default: 0.1)
+        """
+        self.lines = lines
+        self.max_width = max_width
+        self.interval = interval
+        self._texts = [""] * lines
+        self._drawn = None
+        self._width = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def set(self, index, text):
+        """行の文字列を設定する。
+
+        Args:
+            index: 行番号(0 始まり)
+            text: 文字列
+        """
+        self._texts[index] = text
+
+    def start(self):
+        """表示スレッドを開始する。
+        """
+        if self._thread is not None:
+            return
+        # SIGWINCH の監視は呼び出し元(メインスレッド)で開始する
+        _watch_resize()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """表示スレッドを停止し、最終状態を出力する。
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self.refresh()
+
+    def refresh(self):
+        """変化した行を出力する。
+        """
+        with self._lock:
+            frame = self._render()
+            if frame:
+                sys.stdout.write(frame)
+                sys.stdout.flush()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.refresh()
+
+    def _render(self):
+        parts = []
+        if self._drawn is None:
+            # 表示領域を確保し、カーソルを領域の直下に置く
+            parts.append("\n" * self.lines)
+            self._drawn = [None] * self.lines
+        max_width = self.max_width or _get_terminal_size().columns
+        if max_width != self._width:
+            self._width = max_width
+            self._drawn = [None] * self.lines
+        row = self.lines
+        for i, text in enumerate(list(self._texts)):
+            if text == self._drawn[i]:
+                continue
+            self._drawn[i] = text
+            if row > i:
+                parts.append("\x1b[{0}A".format(row - i))
+            elif row < i:
+                parts.append("\x1b[{0}B".format(i - row))
+            # 最終桁への出力による折り返し待ち状態を避けるため 1 桁残す
+            parts.append("\r" + _truncate(text, max_width - 1) + "\x1b[K")
+            row = i
+        if row < self.lines:
+            parts.append("\x1b[{0}B\r".format(self.lines - row))
+        return "".join(parts)
+
+
+class Progress:
+    """進捗(件数、バイト数、速度、残り時間)を表示する。
+
+    表示はバックグラウンドスレッドが interval 秒ごとに行うため、
+    update() は件数を加算するだけで文字列の整形や出力を行わない。
+    複数のワーカースレッドから同時に update() を呼び出してよい。
+
+    Attributes:
+        total: 総件数(不明な場合は None)
+        total_bytes: 総バイト数(不明な場合は None)
+        label: 表示ラベル
+        interval: 表示間隔(秒)
+        smoothing: 速度の移動平均の平滑化係数(0 - 1)
+        count: 処理済み件数
+        bytes: 処理済みバイト数
+    """
+
+    BAR_WIDTH = 20
+    """進捗バーの幅。
+    """
+
+    def __init__(
+            self,
+            total=None,
+            total_bytes=None,
+            label="",
+            interval=0.2,
+            smoothing=0.3,
+            printer=None):
+        """
+        Args:
+            total: 総件数(default: None)
+            total_bytes: 総バイト数(default: None)
+            label: 表示ラベル(default: 空文字)
+            interval: 表示間隔(秒)(default: 0.2)
+            smoothing: 速度の移動平均の平滑化係数(default: 0.3)
+            printer: 出力に使用する LinePrinter(default: None (新規作成))
+        """
+        self.total = total
+        self.total_bytes = total_bytes
+        self.label = label
+        self.interval = interval
+        self.smoothing = smoothing
+        self.count = 0
+        self.bytes = 0
+        self._printer = printer or LinePrinter()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._start_time = None
+        self._last_time = None
+        self._last_count = 0
+        self._last_bytes = 0
+        self._rate = None
+        self._byte_rate = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        """表示スレッドを開始する。
+        """
+        if self._thread is not None:
+            return
+        # SIGWINCH の監視は呼び出し元(メインスレッド)で開始する
+        _watch_resize()
+        self._start_time = self._last_time = time.monotonic()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """表示スレッドを停止し、最終状態を出力して改行する。
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self._render()
+        self._printer.flush()
+        print()
+
+    def update(self, count=1, nbytes=0):
+        """処理済みの件数、バイト数を加算する。
+
+        Args:
+            count: 加算する件数(default: 1)
+            nbytes: 加算するバイト数(default: 0)
+        """
+        with self._lock:
+            self.count += count
+            self.bytes += nbytes
+
+    def wrap(self, iterable):
+        """イテラブルの要素を返すごとに件数を加算する。
+
+        Args:
+            iterable: 対象イテラブル
+
+        Returns:
+            要素を順に返すジェネレーター
+        """
+        if self.total is None and hasattr(iterable, "__len__"):
+            self.total = len(iterable)
+        with self:
+            for item in iterable:
+                yield item
+                self.update()
+
+    def rate(self):
+        """件数の処理速度(件/秒)を取得する。
+
+        Returns:
+            移動平均による処理速度(未計測の場合は None)
+        """
+        return self._rate
+
+    def eta(self):
+        """残り時間(秒)を取得する。
+
+        Returns:
+            残り時間(総件数、総バイト数、速度が不明な場合は None)
+        """
+        if self.total_bytes is not None and self._byte_rate:
+            return max(self.total_bytes - self.bytes, 0) / self._byte_rate
+        if self.total is not None and self._rate:
+            return max(self.total - self.count, 0) / self._rate
+        return None
+
+    def format(self):
+        """現在の進捗を表示用の文字列に整形する。
+
+        Returns:
+            進捗文字列
+        """
+        items = [self.label] if self.label else []
+        if self.total:
+            ratio = min(self.count / self.total, 1.0)
+            filled = int(ratio * self.BAR_WIDTH)
+            items.append("[{0}{1}] {2:3.0f}%".format(
+                "#" * filled, "." * (self.BAR_WIDTH - filled), ratio * 100))
+            items.append("{0}/{1}".format(self.count, self.total))
         else:
-            t = ""
-            for c in text:
-                if texts.width(t + c) > self.max_width:
-                    text = t
-                    break
-                t = t + c
-        print("\r" + text, end="")
+            items.append(str(self.count))
+        if self.bytes or self.total_bytes:
+            items.append(_format_bytes(self.bytes))
+        if self._rate is not None:
+            items.append("{0:.1f} it/s".format(self._rate))
+        if self._byte_rate:
+            items.append(_format_bytes(self._byte_rate) + "/s")
+        eta = self.eta()
+        if eta is not None:
+            items.append("ETA " + _format_seconds(eta))
+        return " ".join(items)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._render()
+
+    def _render(self):
+        self._measure()
+        self._printer.print(self.format())
+
+    def _measure(self):
+        now = time.monotonic()
+        elapsed = now - self._last_time
+        if elapsed <= 0:
+            return
+        with self._lock:
+            count = self.count
+            nbytes = self.bytes
+        rate = (count - self._last_count) / elapsed
+        byte_rate = (nbytes - self._last_bytes) / elapsed
+        if self._rate is None:
+            self._rate = rate
+            self._byte_rate = byte_rate
+        else:
+            self._rate += self.smoothing * (rate - self._rate)
+            self._byte_rate += self.smoothing * (byte_rate - self._byte_rate)
+        self._last_time = now
+        self._last_count = count
+        self._last_bytes = nbytes
+
+
+def _format_bytes(size):
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if size < 1024 or unit == "TB":
+            break
+        size /= 1024
+    return "{0:.1f} {1}".format(size, unit)
+
+
+def _format_seconds(seconds):
+    minutes, sec = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return "{0:02d}:{1:02d}:{2:02d}".format(hours, minutes, sec)
 
 
 def confirm(msg="よろしいですか？(y/n) ",
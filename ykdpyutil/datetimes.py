@@ -1,46 +1,323 @@
 """日時関連のユーティリティモジュール。
 """
-from datetime import datetime
-from typing import Optional
+import functools
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Any, Iterable, List, Optional, Set, Tuple, Union
 
 DEFAULT_PATTERN = "%Y-%m-%d %H:%M:%S.%f"
 """デフォルト日時パターン文字列。
 """
 
+ISO_PATTERN = "%Y-%m-%dT%H:%M:%S.%f"
+"""ISO 8601 形式の日時パターン文字列。
+"""
+
+_FIXED_FIELDS = {
+    "Y": (0, 4),
+    "m": (1, 2),
+    "d": (2, 2),
+    "H": (3, 2),
+    "M": (4, 2),
+    "S": (5, 2),
+    "f": (6, 6),
+}
+"""固定幅で解析できるディレクティブ(datetime の引数位置、桁数)。
+"""
+
+ERR_MSG_NUMPY = "NumPy is required for array conversion. " \
+    "Install it with: pip install ykdpyutil[numpy]"
+
+_Layout = Tuple[int, List[Tuple[int, int, int]], List[Tuple[int, str]]]
+"""固定幅の文字列の配置(文字数、(引数位置、開始位置、桁数)、(位置、文字))。
+"""
+
+
+class DatetimeParser:
+    """日時パターン文字列をコンパイルした日時パーサー。
+
+    任意の日時パターン文字列を datetime.strptime で解析する。
+    get_parser() で取得すると、パターンに応じた高速なパーサーが返される。
+
+    Attributes:
+        pattern: 日時パターン文字列
+    """
+
+    def __init__(self, pattern: str):
+        """
+        Args:
+            pattern: 日時パターン文字列
+        """
+        self.pattern = pattern
+
+    def parse(self, dt_str: Optional[str]) -> Optional[datetime]:
+        """日時文字列から、datetimeオブジェクトを取得する。
+
+        Args:
+            dt_str: 日時文字列
+
+        Returns:
+            datetimeオブジェクト(解析できない場合は None)
+        """
+        if dt_str is None:
+            return None
+        try:
+            return datetime.strptime(dt_str, self.pattern)
+        except ValueError:
+            return None
+
+
+class _FixedParser(DatetimeParser):
+    """数値ディレクティブと固定文字列のみのパターンを正規表現で解析する。
+
+    すべての項目が最大桁数で記述された文字列のみを解析し、
+    それ以外(桁数の省略、空白の連続など)は strptime で解析する。
+    """
+
+    def __init__(self, pattern: str, regex: str, indexes: List[int],
+                 layout: _Layout):
+        super().__init__(pattern)
+        self._regex = re.compile(regex, re.ASCII)
+        self._indexes = indexes
+        self._layout = layout
+        self._fraction_group = indexes.index(6) if 6 in indexes else None
+
+    def parse(self, dt_str: Optional[str]) -> Optional[datetime]:
+        if dt_str is None:
+            return None
+        match = self._regex.fullmatch(dt_str)
+        if match is None:
+            return super().parse(dt_str)
+        values = match.groups()
+        args = [1900, 1, 1, 0, 0, 0, 0]
+        for index, value in zip(self._indexes, values):
+            args[index] = int(value)
+        if self._fraction_group is not None:
+            args[6] = int(values[self._fraction_group].ljust(6, "0"))
+        try:
+            return datetime(args[0], args[1], args[2], args[3],
+                            args[4], args[5], args[6])
+        except ValueError:
+            return None
+
+
+class _IsoParser(_FixedParser):
+    """ISO 8601 形式(マイクロ秒まで)の文字列を fromisoformat で解析する。
+    """
+
+    def __init__(self, pattern: str, regex: str, indexes: List[int],
+                 layout: _Layout):
+        super().__init__(pattern, regex, indexes, layout)
+        self._separator = pattern[8]
+
+    def parse(self, dt_str: Optional[str]) -> Optional[datetime]:
+        if dt_str is not None and len(dt_str) == 26 and dt_str.isascii() \
+                and dt_str[10] == self._separator and dt_str[19] == "." \
+                and dt_str[4] == dt_str[7] == "-" \
+                and dt_str[13] == dt_str[16] == ":":
+            try:
+                result = datetime.fromisoformat(dt_str)
+            except ValueError:
+                result = None
+            if result is not None and result.tzinfo is None:
+                return result
+        return super().parse(dt_str)
 
-def get_from_str(dt_str: Optional[str], pattern: str = DEFAULT_PATTERN) \
+
+@functools.lru_cache(maxsize=128)
+def get_parser(pattern: str = DEFAULT_PATTERN) -> DatetimeParser:
+    """日時パターン文字列をコンパイルした日時パーサーを取得する。
+
+    同じパターンに対しては同じパーサーを返す。
+
+    Args:
+        pattern: 日時パターン文字列
+
+    Returns:
+        日時パーサー
+    """
+    compiled = _compile_fixed(pattern)
+    if compiled is None:
+        return DatetimeParser(pattern)
+    if pattern in (DEFAULT_PATTERN, ISO_PATTERN):
+        return _IsoParser(pattern, *compiled)
+    return _FixedParser(pattern, *compiled)
+
+
+def _compile_fixed(pattern: str):
+    regex = []
+    indexes: List[int] = []
+    fields: List[Tuple[int, int, int]] = []
+    literals: List[Tuple[int, str]] = []
+    position = 0
+    after_field = False
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "%":
+            directive = pattern[i + 1:i + 2]
+            i += 2
+        else:
+            directive = None
+            i += 1
+        if directive is None or directive == "%":
+            c = directive or c
+            regex.append(re.escape(c))
+            literals.append((position, c))
+            position += 1
+            after_field = False
+            continue
+        if directive not in _FIXED_FIELDS:
+            return None
+        index, digits = _FIXED_FIELDS[directive]
+        if index in indexes:
+            return None
+        if index == 6:
+            # %f は 1 - 6 桁のため、他の数値ディレクティブと隣接させない
+            if after_field or pattern[i:i + 1] == "%":
+                return None
+            regex.append("([0-9]{1,6})")
+        else:
+            regex.append("([0-9]{{{0}}})".format(digits))
+        indexes.append(index)
+        fields.append((index, position, digits))
+        position += digits
+        after_field = True
+    return "".join(regex), indexes, (position, fields, literals)
+
+
+def get_from_str(dt_str: Optional[str],
+                 pattern: Union[str, DatetimeParser] = DEFAULT_PATTERN) \
         -> Optional[datetime]:
     """日時文字列から、datetimeオブジェクトを取得する。
 
     Args:
         dt_str: 日時文字列
-        pattern: 日時パターン文字列
+        pattern: 日時パターン文字列、または日時パーサー
 
     Returns:
         datetimeオブジェクト
     """
     if dt_str is None:
         return None
-    try:
-        return datetime.strptime(dt_str, pattern)
-    except ValueError:
-        return None
+    if isinstance(pattern, DatetimeParser):
+        return pattern.parse(dt_str)
+    return get_parser(pattern).parse(dt_str)
+
+
+class DatetimeFormatter:
+    """日時パターン文字列をコンパイルした日時フォーマッター。
+
+    パターンを %f とそれ以外の部分に分割しておき、%f 以外の部分の
+    変換結果を秒単位(秒以下の項目を含まないパターンでは分単位)で
+    キャッシュする。キャッシュが有効な間は、マイクロ秒の埋め込みのみを行う。
+
+    Attributes:
+        pattern: 日時パターン文字列
+    """
+
+    _MINUTE_DIRECTIVES = frozenset("YmdHMIpyCjUWwaAbBhGVugeFDRZz%")
+    """分単位でキャッシュできるディレクティブ。
+    """
+
+    def __init__(self, pattern: str):
+        """
+        Args:
+            pattern: 日時パターン文字列
+        """
+        self.pattern = pattern
+        self._segments: List[str] = []
+        directives: Set[str] = set()
+        segment: List[str] = []
+        i = 0
+        while i < len(pattern):
+            token = pattern[i:i + 2] if pattern[i] == "%" else pattern[i]
+            i += len(token)
+            if token == "%f":
+                self._segments.append("".join(segment))
+                segment = []
+                directives.add("f")
+                continue
+            if len(token) == 2:
+                directives.add(token[1])
+            segment.append(token)
+        self._segments.append("".join(segment))
+        self._resolution = timedelta(minutes=1) \
+            if directives <= self._MINUTE_DIRECTIVES else timedelta(seconds=1)
+        # (キャッシュ開始日時、終了日時、タイムゾーン、fold、変換結果)
+        self._cache: Tuple[datetime, datetime, Any, int, List[str]] = \
+            (datetime.min, datetime.min, None, 0, [])
+
+    def format(self, dt: Optional[datetime]) -> Optional[str]:
+        """datetimeオブジェクトを日時文字列に変換する。
+
+        Args:
+            dt: datetimeオブジェクト
+
+        Returns:
+            日時文字列
+        """
+        if dt is None:
+            return None
+        if type(dt) is not datetime:
+            # date、datetime のサブクラスなどはキャッシュせずに変換する
+            return dt.strftime(self.pattern)
+        start, end, tzinfo, fold, parts = self._cache
+        if dt.tzinfo is not tzinfo or dt.fold != fold \
+                or not start <= dt < end:
+            parts = self._update_cache(dt)
+        if len(parts) == 1:
+            return parts[0]
+        return ("%06d" % dt.microsecond).join(parts)
 
+    def _update_cache(self, dt: datetime) -> List[str]:
+        if self._resolution.seconds == 60:
+            start = dt.replace(second=0, microsecond=0)
+        else:
+            start = dt.replace(microsecond=0)
+        try:
+            end = start + self._resolution
+        except OverflowError:
+            end = datetime.max.replace(tzinfo=dt.tzinfo)
+        parts = [dt.strftime(segment) if "%" in segment else segment
+                 for segment in self._segments]
+        self._cache = (start, end, dt.tzinfo, dt.fold, parts)
+        return parts
 
-def to_str(dt: Optional[datetime], pattern: str = DEFAULT_PATTERN) \
+
+@functools.lru_cache(maxsize=128)
+def get_formatter(pattern: str = DEFAULT_PATTERN) -> DatetimeFormatter:
+    """日時パターン文字列をコンパイルした日時フォーマッターを取得する。
+
+    同じパターンに対しては同じフォーマッターを返す。
+
+    Args:
+        pattern: 日時パターン文字列
+
+    Returns:
+        日時フォーマッター
+    """
+    return DatetimeFormatter(pattern)
+
+
+def to_str(dt: Optional[datetime],
+           pattern: Union[str, DatetimeFormatter] = DEFAULT_PATTERN) \
         -> Optional[str]:
     """datetimeオブジェクトを日時文字列に変換する。
 
     Args:
         dt: datetimeオブジェクト
-        pattern: 日時パターン文字列
+        pattern: 日時パターン文字列、または日時フォーマッター
 
     Returns:
         日時文字列
     """
     if dt is None:
         return None
-    return dt.strftime(pattern)
+    if isinstance(pattern, DatetimeFormatter):
+        return pattern.format(dt)
+    return get_formatter(pattern).format(dt)
 
 
 def get_from_utc(utc: Optional[float]) -> Optional[datetime]:
@@ -69,3 +346,195 @@ def to_utc(dt: Optional[datetime]) -> Optional[float]:
     if dt is None:
         return None
     return dt.timestamp()
+
+
+def get_from_str_many(values: Iterable[Optional[str]],
+                      pattern: Union[str, DatetimeParser] = DEFAULT_PATTERN,
+                      as_array: bool = True) -> Any:
+    """日時文字列の並びから、datetimeオブジェクトを一括で取得する。
+
+    as_array が True の場合は NumPy が必要となる。
+    固定幅のパターンでは、すべての項目が最大桁数で記述された文字列を
+    配列演算で解析し、それ以外の文字列のみを 1 件ずつ解析する。
+
+    Args:
+        values: 日時文字列の並び
+        pattern: 日時パターン文字列、または日時パーサー
+        as_array: NumPy 配列で返すか
+
+    Returns:
+        datetime64[us] 配列(解析できない値は NaT)
+        as_array が False の場合は datetimeオブジェクトのリスト
+    """
+    parser = pattern if isinstance(pattern, DatetimeParser) \
+        else get_parser(pattern)
+    if not as_array:
+        return [parser.parse(v) for v in values]
+    np = _import_numpy()
+    if not isinstance(parser, _FixedParser) or parser._layout[0] == 0:
+        return np.array([parser.parse(v) for v in values],
+                        dtype="datetime64[us]")
+    strs = np.asarray(values if hasattr(values, "__len__") else list(values))
+    if strs.dtype.kind != "U":
+        strs = strs.astype(str)
+    length, fields, literals = parser._layout
+    valid = np.char.str_len(strs) == length
+    codes = np.ascontiguousarray(
+        strs.astype("<U{0}".format(length), copy=False).ravel()) \
+        .view(np.uint32).reshape(-1, length)
+    for position, c in literals:
+        valid &= codes[:, position] == ord(c)
+    # 数字以外の文字は減算で桁あふれし、9 より大きな値となる
+    numbers = codes - 48
+    args = [np.full(len(strs), default, dtype=np.int64)
+            for default in (1900, 1, 1, 0, 0, 0, 0)]
+    for index, start, digits in fields:
+        field_numbers = numbers[:, start:start + digits]
+        valid &= (field_numbers <= 9).all(axis=1)
+        args[index] = field_numbers.astype(np.int64) \
+            @ (10 ** np.arange(digits - 1, -1, -1))
+
+    year, month, day, hour, minute, second, microsecond = args
+    in_range = valid & (year >= 1) & (month >= 1) & (month <= 12) \
+        & (day >= 1) & (hour < 24) & (minute < 60) & (second < 60)
+    year = np.where(in_range, year, 1970)
+    month = np.where(in_range, month, 1)
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    dates = months.astype("datetime64[D]")
+    month_days = ((months + 1).astype("datetime64[D]") - dates) \
+        .astype(np.int64)
+    in_range &= day <= month_days
+    micros = (((hour * 60 + minute) * 60 + second) * 1000000 + microsecond)
+    result = dates.astype("datetime64[us]") \
+        + (day - 1).astype("timedelta64[D]") \
+        + micros.astype("timedelta64[us]")
+    result[~in_range] = np.datetime64("NaT")
+
+    # 最大桁数で記述されていない文字列は 1 件ずつ解析する
+    for i in np.flatnonzero(~valid):
+        result[i] = parser.parse(str(strs[i]))
+    return result
+
+
+def to_str_many(values: Iterable[Any],
+                pattern: str = DEFAULT_PATTERN) -> List[Optional[str]]:
+    """datetimeオブジェクトの並びを日時文字列のリストに一括で変換する。
+
+    datetime64 配列が指定され、パターンが DEFAULT_PATTERN または
+    ISO_PATTERN の場合は配列演算で変換する。
+
+    Args:
+        values: datetimeオブジェクトの並び、または datetime64 配列
+        pattern: 日時パターン文字列
+
+    Returns:
+        日時文字列のリスト(None、NaT の値は None)
+    """
+    formatter = get_formatter(pattern)
+    if getattr(values, "dtype", None) is None \
+            or values.dtype.kind != "M":  # type: ignore
+        return [formatter.format(v) for v in values]
+    np = _import_numpy()
+    array = values.astype("datetime64[us]")  # type: ignore
+    if pattern not in (DEFAULT_PATTERN, ISO_PATTERN):
+        return [formatter.format(v) for v in array.astype(object)]
+    strs = np.datetime_as_string(array, unit="us")
+    if pattern == DEFAULT_PATTERN:
+        strs = np.char.replace(strs, "T", " ")
+    result = strs.astype(object)
+    result[np.isnat(array)] = None
+    return result.tolist()
+
+
+def get_from_utc_many(values: Iterable[Optional[float]],
+                      as_array: bool = True) -> Any:
+    """UTC値の並びから、datetimeオブジェクトを一括で取得する。
+
+    as_array が True の場合は NumPy が必要となる。
+
+    Args:
+        values: UTC値の並び
+        as_array: NumPy 配列で返すか
+
+    Returns:
+        ローカル日時の datetime64[us] 配列(None、NaN の値は NaT)
+        as_array が False の場合は datetimeオブジェクトのリスト
+    """
+    if not as_array:
+        return [get_from_utc(v) for v in values]
+    np = _import_numpy()
+    utc = np.asarray(
+        values if hasattr(values, "__len__") else list(values),
+        dtype=np.float64)
+    valid = ~np.isnan(utc)
+    # datetime.fromtimestamp() と同じく、秒未満の部分だけを丸める
+    # (np.round は偶数丸め)
+    fraction, whole = np.modf(utc[valid])
+    fraction = np.round(fraction * 1000000)
+    micros = np.zeros(len(utc), dtype=np.int64)
+    micros[valid] = whole.astype(np.int64) * 1000000 \
+        + fraction.astype(np.int64)
+    offsets = _local_offsets(
+        np, micros[valid] // 1000000,
+        lambda t: time.localtime(t).tm_gmtoff)
+    micros[valid] += offsets * 1000000
+    result = micros.astype("datetime64[us]")
+    result[~valid] = np.datetime64("NaT")
+    return result
+
+
+def to_utc_many(values: Iterable[Optional[datetime]],
+                as_array: bool = True) -> Any:
+    """datetimeオブジェクトの並びをUTC値に一括で変換する。
+
+    as_array が True の場合は NumPy が必要となる。
+    タイムゾーン情報を持たない日時はローカル日時として扱う。
+
+    Args:
+        values: datetimeオブジェクトの並び、または datetime64 配列
+        as_array: NumPy 配列で返すか
+
+    Returns:
+        UTC値の float64 配列(None、NaT の値は NaN)
+        as_array が False の場合は UTC値のリスト
+    """
+    if not as_array:
+        return [to_utc(v) for v in values]
+    np = _import_numpy()
+    if getattr(values, "dtype", None) is None:
+        values = list(values)
+        # タイムゾーン情報や fold は datetime64 への変換で失われる
+        if any(v is not None and (v.tzinfo is not None or v.fold)
+               for v in values):
+            return np.array([to_utc(v) for v in values], dtype=np.float64)
+    array = np.asarray(values, dtype="datetime64[us]")
+    valid = ~np.isnat(array)
+    micros = array[valid].astype(np.int64)
+    seconds, micros = np.divmod(micros, 1000000)
+    offsets = _local_offsets(
+        np, seconds,
+        lambda t: t - (datetime(1970, 1, 1) + timedelta(seconds=t))
+        .timestamp())
+    result = np.full(len(array), np.nan)
+    result[valid] = (seconds - offsets) + micros / 1000000
+    return result
+
+
+def _local_offsets(np, seconds, get_offset):
+    """秒の配列に対するローカル時刻のオフセット(秒)を取得する。
+
+    タイムゾーンの切り替えは 15 分単位で行われるものとして、
+    15 分ごとの区間につき 1 回だけ get_offset を呼び出す。
+    """
+    buckets, inverse = np.unique(seconds // 900, return_inverse=True)
+    offsets = np.array([get_offset(int(b) * 900) for b in buckets],
+                       dtype=np.int64)
+    return offsets[inverse.reshape(-1)]
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(ERR_MSG_NUMPY) from e
+    return numpy
@@ -1,10 +1,16 @@
 """ファイル関連のユーティリティモジュール。
 """
+import contextlib
+import errno
 import os
-import shutil
+import threading
+import time
+from array import array
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import cast, List, Optional, Tuple
+from typing import cast, Iterable, Iterator, List, Optional, Pattern, \
+    Tuple, Union
 
 from ykdpyutil import datetimes
 
@@ -71,13 +77,105 @@ def get_paths(root: Optional[Path],
     return list(filter(path_filter, plist))
 
 
-def check_exists(path: Path) -> None:
+class StatCache:
+    """パスのメタデータ(stat の結果)のキャッシュ。
+
+    パスごとの stat の結果(存在しない場合は None)を ttl 秒間保持し、
+    maxsize 件を超えた場合は最も長く参照されていないパスから破棄する。
+    ファイルを変更した場合は invalidate() で破棄する。
+
+    Attributes:
+        maxsize: 最大件数
+        ttl: 有効期間(秒)
+        hits: キャッシュから返した回数
+        misses: stat を行った回数
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 1.0):
+        """
+        Args:
+            maxsize: 最大件数(default: 1024)
+            ttl: 有効期間(秒)(default: 1.0)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def stat(self, path: Path) -> Optional[os.stat_result]:
+        """パスの stat の結果を取得する。
+
+        Args:
+            path: 対象パス
+
+        Returns:
+            stat の結果(パスが存在しない場合は None)
+        """
+        key = os.fspath(path)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        result = _stat(path)
+        with self._lock:
+            self._entries[key] = (now + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        """キャッシュを破棄する。
+
+        Args:
+            path: 対象パス(default: None (すべて))
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.fspath(path), None)
+
+    def clear_counters(self) -> None:
+        """hits、misses を 0 に戻す。
+        """
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+def _stat(path: Path) -> Optional[os.stat_result]:
+    """パスの stat の結果を取得する。
+
+    Path.exists() が False を返す場合は None を返す。
+    """
+    try:
+        return os.stat(path)
+    except OSError as e:
+        if e.errno in (errno.ENOENT, errno.ENOTDIR, errno.EBADF,
+                       errno.ELOOP):
+            return None
+        raise
+    except ValueError:
+        return None
+
+
+def check_exists(path: Path, cache: Optional[StatCache] = None) -> None:
     """対象パスの存在を確認する。
 
     Args:
         path: 対象パス
+        cache: メタデータのキャッシュ(default: None (キャッシュしない))
     """
-    if not path.exists():
+    exists = path.exists() if cache is None \
+        else cache.stat(path) is not None
+    if not exists:
         raise OSError(ERR_MSG_NOT_EXISTS.format(str(path)))
 
 
@@ -127,6 +225,7 @@ def copy(src: Optional[Path], dst: Optional[Path]) -> None:
     """
     if src is None or dst is None:
         return None
+    import shutil
     check_exists(src)
     check_not_exists(dst)
     make_parent_dir(dst)
@@ -145,6 +244,7 @@ def move(src: Optional[Path], dst: Optional[Path]) -> None:
     """
     if src is None or dst is None:
         return None
+    import shutil
     check_exists(src)
     check_not_exists(dst)
     make_parent_dir(dst)
@@ -163,6 +263,7 @@ def delete(target: Optional[Path]) -> None:
     if target.is_file():
         os.remove(target)
     else:
+        import shutil
         shutil.rmtree(target)
 
 
@@ -184,62 +285,69 @@ def clear_dir(root: Optional[Path]) -> None:
             path.rmdir()
 
 
-def get_times(path: Optional[Path]) \
+def get_times(path: Optional[Path], cache: Optional[StatCache] = None) \
         -> Tuple[Optional[datetime], Optional[datetime], Optional[datetime]]:
     """パスの日時を取得する。
 
     Args:
         path: 対象パス
+        cache: メタデータのキャッシュ(default: None (キャッシュしない))
 
     Returns:
         作成日時、更新日時、アクセス日時
     """
     if path is None:
         return (None, None, None)
-    if not path.exists():
+    stat = _stat(path) if cache is None else cache.stat(path)
+    if stat is None:
         return (None, None, None)
-    stat = path.stat()
     return (datetimes.get_from_utc(stat.st_ctime),
             datetimes.get_from_utc(stat.st_mtime),
             datetimes.get_from_utc(stat.st_atime))
 
 
-def get_created(path: Optional[Path]) -> Optional[datetime]:
+def get_created(path: Optional[Path],
+                cache: Optional[StatCache] = None) -> Optional[datetime]:
     """パスの作成日時を取得する。
 
     Args:
         path: 対象パス
+        cache: メタデータのキャッシュ(default: None (キャッシュしない))
 
     Returns:
         作成日時
     """
-    result, _, _ = get_times(path)
+    result, _, _ = get_times(path, cache)
     return result
 
 
-def get_updated(path: Optional[Path]) -> Optional[datetime]:
+def get_updated(path: Optional[Path],
+                cache: Optional[StatCache] = None) -> Optional[datetime]:
     """パスの更新日時を取得する。
 
     Args:
         path: 対象パス
+        cache: メタデータのキャッシュ(default: None (キャッシュしない))
 
     Returns:
         更新日時
     """
-    _, result, _ = get_times(path)
+    _, result, _ = get_times(path, cache)
     return result
 
 
-def get_accessed(path: Optional[Path]) -> Optional[datetime]:
+def get_accessed(path: Optional[Path],
+                 cache: Optional[StatCache] = None) -> Optional[datetime]:
     """パスのアクセス日時を取得する。
 
     Args:
         path: 対象パス
+        cache: メタデータのキャッシュ(default: None (キャッシュしない))
 
     Returns:
         アクセス日時
     """
-    _, _, result = get_times(path)
+    _, _, result = get_times(path, cache)
     return result
 
 
@@ -309,3 +417,334 @@ def get_suffix(path: Optional[Path]) -> Optional[str]:
     """
     _, result = get_prefix_suffix(path)
     return result
+
+
+@contextlib.contextmanager
+def _map_file(path: Path):
+    """ファイルを読み取り専用でメモリマップする。
+
+    空のファイルはメモリマップできないため、空のバイト列を返す。
+    """
+    import mmap
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def iter_lines(path: Optional[Path]) -> Iterator[bytes]:
+    """ファイルの各行を順に取得する。
+
+    ファイルをメモリマップして改行文字(\\n)を検索するため、
+    ファイルサイズによらず使用メモリは 1 行分となる。
+
+    Args:
+        path: 対象パス
+
+    Returns:
+        各行(改行文字を除く)を返すイテレーター
+    """
+    if path is None:
+        return iter(())
+    check_exists(path)
+    return _iter_lines(path)
+
+
+def _iter_lines(path: Path) -> Iterator[bytes]:
+    with _map_file(path) as mm:
+        size = len(mm)
+        pos = 0
+        while pos < size:
+            end = mm.find(b"\n", pos)
+            if end < 0:
+                end = size
+            yield mm[pos:end]
+            pos = end + 1
+
+
+def tail(path: Optional[Path], n: int = 10) -> List[bytes]:
+    """ファイルの末尾の行を取得する。
+
+    ファイルをメモリマップし、末尾から改行文字を検索する。
+
+    Args:
+        path: 対象パス
+        n: 行数
+
+    Returns:
+        末尾 n 行(改行文字を除く)のリスト
+    """
+    if path is None or n <= 0:
+        return []
+    check_exists(path)
+    lines: List[bytes] = []
+    with _map_file(path) as mm:
+        end = len(mm)
+        if end == 0:
+            return lines
+        if mm[end - 1:end] == b"\n":
+            end -= 1
+        while len(lines) < n:
+            start = mm.rfind(b"\n", 0, end) + 1
+            lines.append(mm[start:end])
+            if start == 0:
+                break
+            end = start - 1
+    lines.reverse()
+    return lines
+
+
+class LineIndex:
+    """ファイルの行の開始位置の索引。
+
+    ファイルをメモリマップしたまま保持し、任意の行を読み出す。
+    索引は 1 行あたり 8 バイトの配列で保持する。
+
+    Attributes:
+        path: 対象パス
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: 対象パス
+        """
+        check_exists(path)
+        self.path = path
+        self._stack = contextlib.ExitStack()
+        self._mmap = self._stack.enter_context(_map_file(path))
+        self._offsets = array("Q")
+        size = len(self._mmap)
+        pos = 0
+        while pos < size:
+            self._offsets.append(pos)
+            pos = self._mmap.find(b"\n", pos)
+            if pos < 0:
+                break
+            pos += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> bytes:
+        """行を取得する。
+
+        Args:
+            index: 行番号(0 始まり、負の値は末尾から)
+
+        Returns:
+            行(改行文字を除く)
+        """
+        start = self._offsets[index]
+        end = self._mmap.find(b"\n", start)
+        if end < 0:
+            end = len(self._mmap)
+        return self._mmap[start:end]
+
+    def offset(self, index: int) -> int:
+        """行の開始位置を取得する。
+
+        Args:
+            index: 行番号(0 始まり、負の値は末尾から)
+
+        Returns:
+            行の開始位置(バイト)
+        """
+        return self._offsets[index]
+
+    def close(self) -> None:
+        """メモリマップを解放する。
+        """
+        self._stack.close()
+
+
+def search(paths: Iterable[Path],
+           pattern: Union[bytes, Pattern[bytes]],
+           max_workers: Optional[int] = None,
+           processes: bool = False) \
+        -> List[Tuple[Path, int, bytes]]:
+    """複数のファイルから、バイト列または正規表現に一致する行を検索する。
+
+    各ファイルをメモリマップし、ファイルごとに並行して検索する。
+    mmap.find、正規表現の検索は GIL を解放しないため、スレッドでは
+    ファイル読み込みの I/O 待ちのみが並行する。CPU を使用する検索を
+    並列に行う場合は processes に True を指定する。
+
+    Args:
+        paths: 対象パスのリスト
+        pattern: 検索するバイト列、またはコンパイル済みの正規表現
+        max_workers: 最大スレッド数、プロセス数(default: None (既定値))
+        processes: スレッドの代わりにプロセスを使用するか(default: False)
+
+    Returns:
+        一致した行の(パス、行の開始位置、行(改行文字を除く))のリスト
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    paths = list(paths)
+    for path in paths:
+        check_exists(path)
+    executor_class = ProcessPoolExecutor if processes \
+        else ThreadPoolExecutor
+    with executor_class(max_workers=max_workers) as executor:
+        results = executor.map(_search_file, paths,
+                               [pattern] * len(paths))
+        return [match for result in results for match in result]
+
+
+def _search_file(path: Path, pattern: Union[bytes, Pattern[bytes]]) \
+        -> List[Tuple[Path, int, bytes]]:
+    results = []
+    with _map_file(path) as mm:
+        size = len(mm)
+        pos = 0
+        while pos < size:
+            if isinstance(pattern, bytes):
+                hit = mm.find(pattern, pos)
+                if hit < 0:
+                    break
+            else:
+                match = pattern.search(mm, pos)
+                if match is None:
+                    break
+                hit = match.start()
+            start = mm.rfind(b"\n", 0, hit) + 1
+            end = mm.find(b"\n", hit)
+            if end < 0:
+                end = size
+            results.append((path, start, mm[start:end]))
+            pos = end + 1
+    return results
+
+
+def write_atomic(path: Optional[Path], data: Union[bytes, str],
+                 encoding: str = "utf-8") -> None:
+    """ファイルを原子的に書き込む。
+
+    一時ファイルへの書き込み、fsync、リネーム、ディレクトリの fsync を
+    順に行うため、書き込み途中の内容が対象パスに現れることはない。
+
+    Args:
+        path: 対象パス
+        data: 書き込む内容
+        encoding: data が文字列の場合のエンコーディング(default: utf-8)
+    """
+    if path is None:
+        return
+    with AtomicBatch() as batch:
+        batch.write(path, data, encoding)
+
+
+class AtomicBatch:
+    """複数のファイルをまとめて原子的に書き込む。
+
+    write() では一時ファイルへの書き込みのみを行い、
+    commit() で一時ファイルをまとめて fsync した後にすべてリネームし、
+    対象のディレクトリ(write() で作成したディレクトリの親を含む)を
+    それぞれ 1 回だけ fsync する。
+    コンテキストとして使用した場合、正常終了時に commit()、
+    例外発生時に rollback() を行う。
+
+    Attributes:
+        max_workers: fsync を並行して行う最大スレッド数
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_workers: fsync を並行して行う最大スレッド数
+                (default: None (ThreadPoolExecutor の既定値))
+        """
+        self.max_workers = max_workers
+        self._entries: List[Tuple[Path, Path]] = []
+        self._dirs: dict = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.rollback()
+            return
+        try:
+            self.commit()
+        except BaseException:
+            self.rollback()
+            raise
+
+    def write(self, path: Path, data: Union[bytes, str],
+              encoding: str = "utf-8") -> None:
+        """一時ファイルに書き込む。
+
+        Args:
+            path: 対象パス
+            data: 書き込む内容
+            encoding: data が文字列の場合のエンコーディング(default: utf-8)
+        """
+        if isinstance(data, str):
+            data = data.encode(encoding)
+        parent = path.parent
+        while not parent.exists():
+            # 作成するディレクトリのエントリは親ディレクトリの fsync で永続化する
+            self._dirs[parent.parent] = None
+            parent = parent.parent
+        make_parent_dir(path)
+        temp = path.with_name(
+            ".{0}.{1}.tmp".format(path.name, os.urandom(8).hex()))
+        fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        self._entries.append((temp, path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+
+    def commit(self) -> None:
+        """一時ファイルを fsync し、対象パスにリネームする。
+        """
+        if not self._entries:
+            return
+        temps = [temp for temp, _ in self._entries]
+        if len(temps) == 1:
+            _fsync(temps[0], os.O_WRONLY)
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(lambda p: _fsync(p, os.O_WRONLY), temps))
+        dirs = self._dirs
+        self._dirs = {}
+        for i, (temp, path) in enumerate(self._entries):
+            try:
+                os.replace(temp, path)
+            except BaseException:
+                # リネーム済みのファイルは rollback() の対象から外す
+                del self._entries[:i]
+                raise
+            dirs[path.parent] = None
+        self._entries.clear()
+        if os.name == "posix":
+            # 下位のディレクトリから順に fsync する
+            for parent in sorted(dirs, key=lambda p: len(p.parts),
+                                 reverse=True):
+                _fsync(parent, os.O_RDONLY)
+
+    def rollback(self) -> None:
+        """書き込み済みの一時ファイルを削除する。
+        """
+        for temp, _ in self._entries:
+            if temp.exists():
+                temp.unlink()
+        self._entries.clear()
+        self._dirs.clear()
+
+
+def _fsync(path: Path, flags: int) -> None:
+    fd = os.open(path, flags)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)